@@ -6,18 +6,65 @@ This script processes already-downloaded yt-dlp content to create a presentation
 with slides, audio, and picture-in-picture speaker video.
 """
 
+import concurrent.futures
+import copy
+import itertools
 import json
 import os
+import queue
+import re
+import selectors
+import subprocess
 import sys
 import tempfile
+import threading
+import traceback
 import shutil
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, NamedTuple, Set, Tuple, Optional
 from urllib.parse import urlparse
 
 import click
 import ffmpeg
-import yt_dlp
+from tqdm import tqdm
+
+# yt-dlp is by far the slowest import and is only needed for URL input, so it is
+# imported lazily in VideoDownloader.download_video
+
+try:
+    import orjson  # Optional: parses large info.json files several times faster than json
+except ImportError:
+    orjson = None
+
+# Bytes requested per read from ffmpeg's pipes: one read drains a whole burst of output
+# (a read on a pipe returns whatever is available, up to this size)
+_PIPE_READ_SIZE = 65536
+
+# Default CRF for each --preset, used when --crf is not given
+_PRESET_CRF = {
+    "ultrafast": 28,
+    "veryfast": 23,
+    "medium": 23,
+    "slow": 18,
+}
+
+# Slide ID in chapter titles and slide video names (e.g., "Slide 006" -> "006")
+_SLIDE_RE = re.compile(r"Slide\s+(\d+)")
+
+# Image slide file names: [title] [id].[slide_id].[ext] -> ("[title] [id]", slide_id)
+_IMAGE_SLIDE_RE = re.compile(r"^(.+)\.(\d+)\.(png|jpg|jpeg|webp)$")
+
+# Preference order when a slide image exists with several extensions
+_IMAGE_EXT_RANK = {"png": 0, "jpg": 1, "jpeg": 2, "webp": 3}
+
+
+def _chapter_slide_ids(chapters: List[dict]) -> List[Optional[str]]:
+    """Slide ID of each chapter, from its title (None when the title has none)."""
+    slide_ids = []
+    for chapter in chapters:
+        match = _SLIDE_RE.search(chapter.get("title", ""))
+        slide_ids.append(match.group(1) if match else None)
+    return slide_ids
 
 
 class ValidationError(Exception):
@@ -50,129 +97,18 @@ class VideoDownloader:
         click.echo(f"Downloading video from: {url}")
         click.echo(f"Saving to: {output_dir}")
 
-        # Custom logger to capture thumbnail download messages
-        import re
-        import logging
-        from tqdm import tqdm
-
-        class ThumbnailLogger:
-            """Custom logger to capture and display thumbnail download info with progress bar."""
-
-            def __init__(self, verbose):
-                self.verbose = verbose
-                self.pbar = None  # Progress bar for thumbnails
-                self.max_slide = None  # Highest slide number (initialized on first thumbnail)
-                self.downloading_video = False  # Track when video download starts
-
-            def _handle_thumbnail(self, msg):
-                """Handle thumbnail download messages and update progress bar."""
-                match = re.search(r"\.(\d+)\.(png|jpg|jpeg|webp)", msg)
-                if match:
-                    slide_num = int(match.group(1))
-
-                    # Initialize progress bar on first thumbnail (highest number)
-                    if self.pbar is None:
-                        self.max_slide = slide_num
-                        # Total slides from max_slide down to 1 (not 0)
-                        self.pbar = tqdm(
-                            total=slide_num,  # Count from max_slide to 1
-                            desc="Downloading slides",
-                            unit="slide",
-                            initial=0
-                        )
-
-                    # Update progress: count how many slides we've completed
-                    # yt-dlp goes from max down to 1, so completed = (max_slide - current_slide)
-                    completed = self.max_slide - slide_num
-                    self.pbar.n = completed
-                    self.pbar.set_postfix_str(f"slide {slide_num}")
-                    self.pbar.refresh()
-
-                    # Close progress bar when we reach slide 1
-                    if slide_num == 1 and self.pbar is not None:
-                        self.pbar.n = self.max_slide  # Complete it
-                        self.pbar.close()
-                        self.pbar = None
-
-                    return True
-                return False
-
-            def debug(self, msg):
-                # Capture thumbnail download messages (ALWAYS, even in non-verbose mode)
-                if "Writing thumbnail" in msg or "Writing video thumbnail" in msg or "thumbnail" in msg.lower():
-                    if self._handle_thumbnail(msg):
-                        return
-
-                # Show ALL debug messages during video download (even in non-verbose mode)
-                if self.downloading_video:
-                    click.echo(f"[debug] {msg}")
-                    return
-
-                # Only show other debug messages in verbose mode
-                if self.verbose:
-                    click.echo(f"[debug] {msg}")
-
-            def info(self, msg):
-                # Capture thumbnail download messages (ALWAYS, even in non-verbose mode)
-                # yt-dlp outputs: "[info] Writing thumbnail to: filename.123.png"
-                if "Writing thumbnail" in msg or "Writing video thumbnail" in msg:
-                    if self._handle_thumbnail(msg):
-                        return
-
-                # Detect when yt-dlp moves on from downloading slides to other activities
-                # This could be: downloading video files, extracting info, merging formats, etc.
-                # Close the thumbnail progress bar if it's still open and we see non-slide activity
-                if self.pbar is not None:
-                    # These messages indicate yt-dlp has moved on from slides
-                    non_slide_indicators = [
-                        "Downloading",
-                        "destination:",
-                        "[download]",
-                        "Merging formats",
-                        "Deleting original file",
-                        "has already been downloaded",
-                        "Extracting URL",
-                        "[ExtractAudio]",
-                        "Post-processing"
-                    ]
-                    if any(indicator in msg for indicator in non_slide_indicators):
-                        # Complete and close the progress bar
-                        self.pbar.n = self.pbar.total  # Mark as complete
-                        self.pbar.close()
-                        self.pbar = None
-                        self.downloading_video = True
-
-                # Show video download and processing messages (ALWAYS, even in non-verbose mode)
-                if self.downloading_video:
-                    click.echo(f"[info] {msg}")
-                    return
-
-                # Only show other info messages in verbose mode
-                if self.verbose:
-                    click.echo(f"[info] {msg}")
-
-            def warning(self, msg):
-                # Always show warnings during video download
-                if self.downloading_video:
-                    click.echo(f"[warning] {msg}")
-                    return
-
-                if self.verbose:
-                    click.echo(f"[warning] {msg}")
-
-            def error(self, msg):
-                click.echo(f"[error] {msg}", err=True)
-
-        logger = ThumbnailLogger(self.verbose)
+        import yt_dlp
 
         # Check if the URL is from SlidesLive (the intended platform)
         # This tool is designed for SlidesLive videos which have chapter slides
         try:
             click.echo("Checking video source...")
             with yt_dlp.YoutubeDL({'quiet': True}) as ydl:
-                # Extract info without downloading to check the extractor
-                test_info = ydl.extract_info(url, download=False)
-                extractor = test_info.get('extractor_key', 'unknown')
+                # Extract info without downloading to check the extractor.
+                # Both download passes below reuse this info instead of re-extracting it,
+                # so the page is only fetched and parsed once.
+                info = ydl.extract_info(url, download=False)
+                extractor = info.get('extractor_key', 'unknown')
 
                 if extractor != 'SlidesLive':
                     click.echo(f"\n⚠️  Warning: This video is from '{extractor}', not SlidesLive.", err=True)
@@ -190,25 +126,28 @@ class VideoDownloader:
         except yt_dlp.utils.DownloadError as e:
             raise ValidationError(f"Could not access URL: {e}")
 
-        # Download in two passes:
-        # Pass 1: Download thumbnails only (with custom logger for progress bar)
-        # Pass 2: Download videos (without logger to show native yt-dlp progress)
+        # Download in two passes, both from the info extracted above:
+        # Pass 1: Download thumbnails (concurrently, with progress bar) and metadata
+        # Pass 2: Download videos (with native yt-dlp progress)
 
         try:
-            # Pass 1: Thumbnails with progress bar
+            # Pass 1: Thumbnails with progress bar, then info.json
             click.echo("Downloading slides...")
             ydl_opts_thumbnails = {
                 "skip_download": True,  # Don't download videos in this pass
                 "writeinfojson": True,  # --write-info-json: save metadata
-                "write_all_thumbnails": True,  # --write-all-thumbnails: save ALL thumbnails
                 "outtmpl": os.path.join(output_dir, "%(title)s [%(id)s].%(ext)s"),
-                "logger": logger,  # Use custom logger for thumbnail progress
+                "quiet": not self.verbose,
             }
 
             with yt_dlp.YoutubeDL(ydl_opts_thumbnails) as ydl:
-                info = ydl.extract_info(url, download=True)
+                # Thumbnails first, so that info.json only lists the ones that were downloaded
+                self._download_thumbnails(ydl, info)
+
+                # Process a copy: yt-dlp annotates the info dict while processing it
+                ydl.process_ie_result(copy.deepcopy(info), download=True)
 
-            # Pass 2: Download videos with native yt-dlp progress (no custom logger)
+            # Pass 2: Download videos with native yt-dlp progress
             click.echo("\nDownloading video files...")
 
             # Determine format based on high_res_speaker flag
@@ -225,11 +164,10 @@ class VideoDownloader:
                 "concurrent_fragment_downloads": 5,  # -N 5: parallel downloads
                 "format": video_format,
                 "outtmpl": os.path.join(output_dir, "%(title)s [%(id)s].%(ext)s"),
-                # No logger - let yt-dlp show its native progress bars
             }
 
             with yt_dlp.YoutubeDL(ydl_opts_videos) as ydl:
-                ydl.download([url])
+                ydl.process_ie_result(info, download=True)
 
                 if info:
                     click.echo(f"✓ Download complete: {info.get('title', 'Video')}")
@@ -238,6 +176,98 @@ class VideoDownloader:
         except Exception as e:
             raise ValidationError(f"Download failed: {e}")
 
+    def _download_thumbnails(self, ydl, info: dict):
+        """
+        Download all slide thumbnails concurrently.
+
+        yt-dlp's --write-all-thumbnails fetches them one at a time, so a deck of
+        N slides costs N sequential HTTP round-trips. Here they are fetched from a
+        thread pool through yt-dlp's own HTTP stack (same headers, cookies and
+        proxy), into the same file names yt-dlp would use. Like yt-dlp, thumbnails
+        that cannot be downloaded are dropped from the thumbnail lists.
+
+        Talks with video slides are extracted as a playlist (the talk, then one
+        entry per slide video); the slide thumbnails are then on the entries,
+        not on the playlist itself.
+
+        Args:
+            ydl: YoutubeDL instance used for file naming and HTTP requests
+            info: Extracted video or playlist info (thumbnail lists are updated in place)
+        """
+        from yt_dlp.networking import Request
+        from yt_dlp.networking.exceptions import HTTPError, network_exceptions
+        from yt_dlp.utils import determine_ext, replace_extension
+
+        if info.get("_type") == "playlist":
+            entries = [entry for entry in info.get("entries") or [] if entry]
+        else:
+            entries = [info]
+
+        # (entry, entry video file name, thumbnail): each thumbnail is named after the video
+        # it belongs to, so the file name is prepared once per entry
+        jobs = []
+        for entry in entries:
+            thumbnails = entry.get("thumbnails") or []
+            if thumbnails:
+                filename = ydl.prepare_filename(entry)
+                os.makedirs(os.path.dirname(filename) or ".", exist_ok=True)
+                jobs.extend((entry, filename, thumb) for thumb in thumbnails)
+        if not jobs:
+            click.echo("No slide thumbnails to download")
+            return
+
+        def fetch(entry, filename, thumb):
+            # Saved as [title] [id].[thumbnail_id].[ext], next to the entry's video
+            thumb_ext = thumb.get("ext") or determine_ext(thumb["url"], "jpg")
+            thumb_path = replace_extension(filename, f"{thumb['id']}.{thumb_ext}", entry.get("ext"))
+            if os.path.exists(thumb_path):
+                return  # Already downloaded (e.g., resuming with --temp-dir)
+            # Download to a .part file, renamed once complete: an interrupted transfer
+            # must not leave a truncated image that a resumed run would take as done
+            part_path = thumb_path + ".part"
+            with ydl.urlopen(Request(thumb["url"], headers=thumb.get("http_headers", {}))) as response:
+                with open(part_path, "wb") as f:
+                    shutil.copyfileobj(response, f)
+            os.replace(part_path, thumb_path)
+
+        failed = set()  # (id(entry), thumbnail id) of the thumbnails that could not be downloaded
+        # 16 requests in flight: round-trips overlap without hammering the server
+        with concurrent.futures.ThreadPoolExecutor(max_workers=16) as pool:
+            futures = {pool.submit(fetch, *job): job for job in jobs}
+            with tqdm(total=len(futures), desc="Downloading slides", unit="slide") as pbar:
+                for future in concurrent.futures.as_completed(futures):
+                    entry, _, thumb = futures[future]
+                    try:
+                        future.result()
+                    except network_exceptions as e:
+                        failed.add((id(entry), thumb["id"]))
+                        # A missing thumbnail is not worth a warning (yt-dlp stays quiet too)
+                        if not (isinstance(e, HTTPError) and e.status == 404):
+                            # Through tqdm, so the message does not break the progress bar
+                            pbar.write(
+                                f"[warning] Unable to download slide thumbnail {thumb['id']}: {e}",
+                                file=sys.stderr,
+                            )
+                    pbar.update(1)
+
+        if failed:
+            for entry in entries:
+                if entry.get("thumbnails"):
+                    entry["thumbnails"] = [
+                        t for t in entry["thumbnails"] if (id(entry), t["id"]) not in failed
+                    ]
+
+
+class DirectoryScan:
+    """Files of the input directory, bucketed by role during a single directory scan."""
+
+    def __init__(self):
+        self.file_names: Set[str] = set()  # Every entry name, for existence checks without a stat
+        self.main_videos: List[Path] = []  # [title] [id].mp4
+        self.info_jsons: List[Path] = []  # [title] [id].info.json
+        self.video_slides_by_id: Dict[str, List[Path]] = {}  # [title] - Slide [id] [video_id-id].mp4
+        self.images_by_slide_id: Dict[Tuple[str, str], Path] = {}  # [title] [id].[slide_id].[ext]
+
 
 class ContentValidator:
     """Validates that all required files are present in the input directory."""
@@ -250,7 +280,56 @@ class ContentValidator:
         if self.verbose:
             click.echo(f"[Validator] {message}")
 
-    def find_main_video(self, input_dir: Path) -> Path:
+    def scan_directory(self, input_dir: Path) -> DirectoryScan:
+        """
+        List the input directory once and bucket its files by role.
+
+        A single os.scandir() replaces the per-slide globs, which each re-read
+        the whole directory.
+
+        Args:
+            input_dir: Directory containing downloaded content
+
+        Returns:
+            DirectoryScan with main videos, info.json files, slide videos and slide images
+        """
+        self._log(f"Scanning {input_dir}")
+
+        scan = DirectoryScan()
+        with os.scandir(input_dir) as entries:
+            for entry in entries:
+                name = entry.name
+                scan.file_names.add(name)
+                if name.endswith(".mp4"):
+                    if "Slide" in name:
+                        # Slide videos, indexed by slide ID (e.g., "Slide 006" -> "006")
+                        match = _SLIDE_RE.search(name)
+                        if match:
+                            scan.video_slides_by_id.setdefault(match.group(1), []).append(
+                                Path(entry.path)
+                            )
+                    else:
+                        scan.main_videos.append(Path(entry.path))
+                elif name.endswith(".info.json"):
+                    # Exclude slide and playlist JSON files
+                    if "Slide" not in name and "playlist" not in name:
+                        scan.info_jsons.append(Path(entry.path))
+                else:
+                    # Slide images, indexed by (video name, slide ID). The scan order is
+                    # arbitrary, so keep the best-ranked extension (png, jpg, jpeg, webp)
+                    match = _IMAGE_SLIDE_RE.match(name)
+                    if match:
+                        key = (match.group(1), match.group(2))
+                        current = scan.images_by_slide_id.get(key)
+                        if (
+                            current is None
+                            or _IMAGE_EXT_RANK[match.group(3)] < _IMAGE_EXT_RANK[current.suffix[1:]]
+                        ):
+                            scan.images_by_slide_id[key] = Path(entry.path)
+
+        return scan
+
+    def find_main_video(self, input_dir: Path, scan: DirectoryScan) -> Path:
         """
         Find the main speaker video file.
 
@@ -259,6 +338,7 @@ class ContentValidator:
 
         Args:
             input_dir: Directory containing downloaded content
+            scan: Result of scan_directory() for input_dir
 
         Returns:
             Path to the main video file
@@ -268,11 +348,7 @@ class ContentValidator:
         """
         self._log(f"Looking for main video in {input_dir}")
 
-        video_files = []
-        for file in input_dir.glob("*.mp4"):
-            # Exclude slide videos (contain "Slide" in the name)
-            if "Slide" not in file.name and " - Slide " not in file.name:
-                video_files.append(file)
+        video_files = scan.main_videos
 
         if len(video_files) == 0:
             raise ValidationError("No speaker video found. Expected: [title] [id].mp4")
@@ -285,7 +361,7 @@ class ContentValidator:
         self._log(f"Found main video: {video_files[0].name}")
         return video_files[0]
 
-    def find_info_json(self, input_dir: Path) -> Path:
+    def find_info_json(self, input_dir: Path, scan: DirectoryScan) -> Path:
         """
         Find the info.json metadata file.
 
@@ -294,6 +370,7 @@ class ContentValidator:
 
         Args:
             input_dir: Directory containing downloaded content
+            scan: Result of scan_directory() for input_dir
 
         Returns:
             Path to the info.json file
@@ -303,11 +380,7 @@ class ContentValidator:
         """
         self._log(f"Looking for info.json in {input_dir}")
 
-        json_files = []
-        for file in input_dir.glob("*.info.json"):
-            # Exclude slide and playlist JSON files
-            if "Slide" not in file.name and "playlist" not in file.name:
-                json_files.append(file)
+        json_files = scan.info_jsons
 
         if len(json_files) == 0:
             raise ValidationError("No info.json found. Expected: [title] [id].info.json")
@@ -332,7 +405,7 @@ class ContentValidator:
             json_path: Path to the info.json file
 
         Returns:
-            Parsed JSON data
+            Parsed JSON data, reduced to the chapters and thumbnails fields
 
         Raises:
             ValidationError: If JSON is malformed or missing required fields
@@ -340,9 +413,11 @@ class ContentValidator:
         self._log(f"Validating JSON structure: {json_path.name}")
 
         try:
-            with open(json_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-        except json.JSONDecodeError as e:
+            # Read raw bytes: both parsers decode UTF-8 themselves, without an intermediate str
+            with open(json_path, "rb") as f:
+                raw = f.read()
+            data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+        except json.JSONDecodeError as e:  # orjson.JSONDecodeError is a subclass
             raise ValidationError(f"Invalid JSON file: {e}")
 
         # Check for required fields
@@ -369,10 +444,12 @@ class ContentValidator:
         self._log(
             f"JSON valid: {len(data['chapters'])} chapters, {len(data['thumbnails'])} thumbnails"
         )
-        return data
+        # Keep only what the rest of the pipeline uses: yt-dlp's formats, fragments and
+        # subtitles can be megabytes, and would otherwise stay in memory during the encode
+        return {"chapters": data["chapters"], "thumbnails": data["thumbnails"]}
 
     def validate_slide_files(
-        self, input_dir: Path, json_data: dict, video_name: str
+        self, input_dir: Path, json_data: dict, video_name: str, scan: DirectoryScan
     ) -> Dict[str, Tuple[Path, str]]:
         """
         Validate that slide files exist for each thumbnail.
@@ -383,8 +460,9 @@ class ContentValidator:
 
         Args:
             input_dir: Directory containing downloaded content
-            json_data: Parsed JSON metadata
+            json_data: Parsed JSON metadata (with "slide_ids" from validate_all, if available)
             video_name: Name of the main video file (without extension)
+            scan: Result of scan_directory() for input_dir
 
         Returns:
             Dictionary mapping slide IDs to (path, type) tuples
@@ -394,14 +472,16 @@ class ContentValidator:
         """
         self._log("Validating slide files")
 
-        import re
-
         slide_mapping = {}
         chapters = json_data["chapters"]
         thumbnails = json_data["thumbnails"]
+        slide_ids = json_data.get("slide_ids")
+        if slide_ids is None:
+            slide_ids = _chapter_slide_ids(chapters)
 
-        # Create a set of thumbnail IDs for quick lookup
-        thumbnail_ids = {thumb["id"] for thumb in thumbnails}
+        # Index thumbnails by ID: one hash lookup per chapter both tells whether the
+        # slide has a thumbnail and finds it
+        thumbnail_by_id = {thumb["id"]: thumb for thumb in thumbnails}
 
         # Counters for reporting
         skipped_count = 0
@@ -410,57 +490,47 @@ class ContentValidator:
 
         # Go through chapters and match with thumbnails
         thumbnail_idx = 0
-        for chapter_idx, chapter in enumerate(chapters):
-            # Extract slide ID from chapter title (e.g., "Slide 006" -> "006")
+        for chapter_idx, (chapter, slide_id) in enumerate(zip(chapters, slide_ids)):
+            # Slide ID extracted from the chapter title (e.g., "Slide 006" -> "006")
             title = chapter.get("title", "")
-            match = re.search(r"Slide\s+(\d+)", title)
 
-            if not match:
+            if slide_id is None:
                 self._log(
                     f"Warning: Chapter {chapter_idx} has no slide ID in title: '{title}', skipping"
                 )
                 skipped_count += 1
                 continue
 
-            slide_id = match.group(1)
-
             # Check if this slide has a thumbnail (image)
-            if slide_id in thumbnail_ids:
+            thumbnail = thumbnail_by_id.get(slide_id)
+            if thumbnail is not None:
                 # This slide has an image - use the thumbnail
-                # Find the thumbnail with this ID
-                thumbnail = next((t for t in thumbnails if t["id"] == slide_id), None)
-                if thumbnail:
-                    url = thumbnail["url"]
-                    url_path = Path(url)
-                    ext = url_path.suffix.lstrip(".")
-
-                    # Check for image slide
-                    image_path = input_dir / f"{video_name}.{slide_id}.{ext}"
-                    if image_path.exists():
-                        slide_mapping[slide_id] = (image_path, "image")
+                url = thumbnail["url"]
+                url_path = Path(url)
+                ext = url_path.suffix.lstrip(".")
+
+                # Check for image slide (a set lookup in the scan instead of a stat per slide)
+                image_name = f"{video_name}.{slide_id}.{ext}"
+                if image_name in scan.file_names:
+                    image_path = input_dir / image_name
+                    slide_mapping[slide_id] = (image_path, "image")
+                    image_count += 1
+                    self._log(f"Found image slide: {image_path.name}")
+                else:
+                    # Try other common image extensions (png, jpg, jpeg, webp) from the scan
+                    alt_path = scan.images_by_slide_id.get((video_name, slide_id))
+                    if alt_path is not None:
+                        slide_mapping[slide_id] = (alt_path, "image")
                         image_count += 1
-                        self._log(f"Found image slide: {image_path.name}")
+                        self._log(f"Found image slide: {alt_path.name}")
                     else:
-                        # Try other common image extensions
-                        found = False
-                        for alt_ext in ["png", "jpg", "jpeg", "webp"]:
-                            alt_path = input_dir / f"{video_name}.{slide_id}.{alt_ext}"
-                            if alt_path.exists():
-                                slide_mapping[slide_id] = (alt_path, "image")
-                                image_count += 1
-                                self._log(f"Found image slide: {alt_path.name}")
-                                found = True
-                                break
-
-                        if not found:
-                            raise ValidationError(
-                                f"Slide file not found for thumbnail {slide_id}. "
-                                f"Expected: {video_name}.{slide_id}.{ext}"
-                            )
+                        raise ValidationError(
+                            f"Slide file not found for thumbnail {slide_id}. "
+                            f"Expected: {video_name}.{slide_id}.{ext}"
+                        )
             else:
                 # This slide does NOT have a thumbnail - look for video slide
-                video_pattern = f"*Slide {slide_id}*.mp4"
-                video_slides = list(input_dir.glob(video_pattern))
+                video_slides = scan.video_slides_by_id.get(slide_id, [])
 
                 if video_slides:
                     slide_mapping[slide_id] = (video_slides[0], "video")
@@ -487,7 +557,8 @@ class ContentValidator:
             input_dir: Path to directory containing downloaded content
 
         Returns:
-            Tuple of (video_path, json_data, slide_mapping)
+            Tuple of (video_path, json_data, slide_mapping, image_count, video_count, skipped_count),
+            where json_data also holds the chapters' "slide_ids"
 
         Raises:
             ValidationError: If any validation fails
@@ -500,22 +571,37 @@ class ContentValidator:
         if not input_path.is_dir():
             raise ValidationError(f"Input path is not a directory: {input_dir}")
 
+        # List the directory once; all lookups below use this scan
+        scan = self.scan_directory(input_path)
+
         # Find main video
-        video_path = self.find_main_video(input_path)
+        video_path = self.find_main_video(input_path, scan)
         video_name = video_path.stem  # Name without extension
 
         # Find and validate JSON
-        json_path = self.find_info_json(input_path)
+        json_path = self.find_info_json(input_path, scan)
         json_data = self.validate_json_structure(json_path)
 
+        # Extract each chapter's slide ID once, for both the slide files and the timeline
+        json_data["slide_ids"] = _chapter_slide_ids(json_data["chapters"])
+
         # Validate slide files
         slide_mapping, image_count, video_count, skipped_count = self.validate_slide_files(
-            input_path, json_data, video_name
+            input_path, json_data, video_name, scan
         )
 
         return video_path, json_data, slide_mapping, image_count, video_count, skipped_count
 
 
+class SlideSpan(NamedTuple):
+    """A slide shown over a time range of the talk (one timeline entry)."""
+
+    start_time: float
+    end_time: float
+    slide_path: Path
+    slide_type: str  # "image" or "video"
+
+
 class SlideMapper:
     """Maps chapters to slide files and builds timeline."""
 
@@ -529,31 +615,32 @@ class SlideMapper:
 
     def build_slide_timeline(
         self, json_data: dict, slide_mapping: Dict[str, Tuple[Path, str]]
-    ) -> List[Tuple[float, float, Path, str]]:
+    ) -> List[SlideSpan]:
         """
         Build timeline mapping chapters to slide files.
 
-        Creates a timeline structure: [(start_time, end_time, slide_path, slide_type)]
+        Creates a timeline structure: [SlideSpan(start_time, end_time, slide_path, slide_type)]
 
         Args:
-            json_data: Parsed JSON metadata
+            json_data: Parsed JSON metadata (with "slide_ids" from validate_all, if available)
             slide_mapping: Dictionary mapping slide IDs to (path, type) tuples
 
         Returns:
-            List of timeline entries
+            List of timeline entries, sorted by start time
 
         Raises:
             ValidationError: If chapters cannot be mapped to slides
         """
-        import re
-
         self._log("Building slide timeline")
 
         chapters = json_data["chapters"]
+        slide_ids = json_data.get("slide_ids")
+        if slide_ids is None:
+            slide_ids = _chapter_slide_ids(chapters)
 
         timeline = []
 
-        for i, chapter in enumerate(chapters):
+        for i, (chapter, slide_id) in enumerate(zip(chapters, slide_ids)):
             start_time = float(chapter["start_time"])
             end_time = float(chapter["end_time"])
             title = chapter.get("title", f"Chapter {i+1}")
@@ -566,15 +653,11 @@ class SlideMapper:
                 )
                 end_time = start_time + 0.1
 
-            # Extract slide ID from chapter title (e.g., "Slide 001" -> "001")
-            slide_id_match = re.search(r"Slide\s+(\d+)", title)
-
-            if slide_id_match:
-                slide_id = slide_id_match.group(1)
-
+            # slide_id: extracted from the chapter title (e.g., "Slide 001" -> "001")
+            if slide_id is not None:
                 if slide_id in slide_mapping:
                     slide_path, slide_type = slide_mapping[slide_id]
-                    timeline.append((start_time, end_time, slide_path, slide_type))
+                    timeline.append(SlideSpan(start_time, end_time, slide_path, slide_type))
                     self._log(
                         f"Chapter {i+1} ({title}): {start_time:.2f}s-{end_time:.2f}s -> {slide_path.name} ({slide_type})"
                     )
@@ -588,6 +671,10 @@ class SlideMapper:
         if not timeline:
             raise ValidationError("No chapters found to create timeline")
 
+        # yt-dlp keeps the chapters in the extractor's order, which is not guaranteed
+        # to be chronological: sort by start time (stable, so ties keep chapter order)
+        timeline.sort(key=lambda entry: entry.start_time)
+
         self._log(f"Built timeline with {len(timeline)} entries")
         return timeline
 
@@ -595,6 +682,16 @@ class SlideMapper:
 class VideoGenerator:
     """Generates the final video using FFmpeg."""
 
+    # PiP overlay coordinates for each --pip-position (no padding, directly in corners)
+    # W and H in overlay refer to the main video (slides) dimensions
+    # w and h refer to the overlay video (PiP) dimensions
+    _POSITIONS = {
+        "top-right": {"x": "W-w", "y": "0"},
+        "top-left": {"x": "0", "y": "0"},
+        "bottom-right": {"x": "W-w", "y": "H-h"},
+        "bottom-left": {"x": "0", "y": "H-h"},
+    }
+
     def __init__(self, verbose: bool = False, hw_accel: bool = False):
         self.verbose = verbose
         self.hw_accel = hw_accel
@@ -612,7 +709,8 @@ class VideoGenerator:
         Checks for encoders in priority order:
         1. h264_videotoolbox (macOS hardware encoding)
         2. h264_nvenc (NVIDIA hardware encoding)
-        3. libx264 (software encoding, always available)
+        3. h264_qsv (Intel Quick Sync hardware encoding)
+        4. libx264 (software encoding, always available)
 
         Returns:
             str: Best available encoder name
@@ -626,10 +724,8 @@ class VideoGenerator:
             self._log("Using software encoding (libx264). Use --hw-accel to enable hardware acceleration.")
             return self._available_encoders
 
-        import subprocess
-
         # Check for available encoders (hardware acceleration requested)
-        encoders_to_check = ['h264_videotoolbox', 'h264_nvenc', 'libx264']
+        encoders_to_check = ['h264_videotoolbox', 'h264_nvenc', 'h264_qsv', 'libx264']
 
         try:
             # Run ffmpeg -encoders and capture output
@@ -642,9 +738,9 @@ class VideoGenerator:
 
             output = result.stdout
 
-            # Check each encoder in priority order
+            # Check each encoder in priority order (hardware ones must also pass a test encode)
             for encoder in encoders_to_check:
-                if encoder in output:
+                if encoder in output and (encoder == 'libx264' or self._encoder_works(encoder)):
                     self._available_encoders = encoder
                     self._log(f"Selected video encoder: {encoder}")
                     return encoder
@@ -657,9 +753,97 @@ class VideoGenerator:
         self._log("Fallback to libx264 encoder")
         return self._available_encoders
 
+    def _encoder_works(self, encoder: str) -> bool:
+        """
+        Check that an encoder can actually be opened, by encoding a single small frame.
+
+        ffmpeg lists every hardware encoder it was built with, even on machines without
+        the matching GPU or driver (typical of static builds), so appearing in
+        `ffmpeg -encoders` does not mean the encode will work.
+
+        Args:
+            encoder: FFmpeg encoder name (e.g., h264_nvenc)
+
+        Returns:
+            True if the test encode succeeded
+        """
+        test_cmd = [
+            'ffmpeg', '-hide_banner', '-v', 'error',
+            '-f', 'lavfi', '-i', 'color=size=256x256:duration=0.1',
+            '-frames:v', '1',
+            '-c:v', encoder,
+            '-f', 'null', '-'
+        ]
+
+        try:
+            result = subprocess.run(test_cmd, capture_output=True, timeout=10)
+        except (subprocess.TimeoutExpired, FileNotFoundError) as e:
+            self._log(f"Warning: Could not test encoder {encoder}: {e}")
+            return False
+
+        if result.returncode != 0:
+            self._log(f"Encoder {encoder} is listed by ffmpeg but not usable here, skipping")
+            return False
+        return True
+
+    def _probe_audio_codec(self, path: Path) -> Optional[str]:
+        """
+        Probe the codec of the first audio stream of a file.
+
+        Args:
+            path: File to probe
+
+        Returns:
+            Codec name (e.g., "aac"), or None if the file has no audio stream
+
+        Raises:
+            subprocess.CalledProcessError: If ffprobe fails
+            json.JSONDecodeError: If ffprobe output is not valid JSON
+        """
+        probe_cmd = [
+            'ffprobe',
+            '-v', 'error',
+            '-select_streams', 'a:0',
+            '-show_entries', 'stream=codec_name',
+            '-of', 'json',
+            str(path)
+        ]
+
+        probe_result = subprocess.run(probe_cmd, capture_output=True, text=True, check=True)
+        streams = json.loads(probe_result.stdout).get('streams') or [{}]
+        return streams[0].get('codec_name')
+
+    def _probe_dimensions(self, path: Path) -> Tuple[int, int]:
+        """
+        Probe the width and height of the first video stream of an image or video file.
+
+        Args:
+            path: File to probe
+
+        Returns:
+            Tuple of (width, height)
+
+        Raises:
+            subprocess.CalledProcessError: If ffprobe fails
+            json.JSONDecodeError: If ffprobe output is not valid JSON
+            KeyError: If ffprobe output has no width/height
+        """
+        probe_cmd = [
+            'ffprobe',
+            '-v', 'error',
+            '-select_streams', 'v:0',
+            '-show_entries', 'stream=width,height',
+            '-of', 'json',
+            str(path)
+        ]
+
+        probe_result = subprocess.run(probe_cmd, capture_output=True, text=True, check=True)
+        probe_data = json.loads(probe_result.stdout)
+        return probe_data['streams'][0]['width'], probe_data['streams'][0]['height']
+
     def process(
         self,
-        timeline: List[Tuple[float, float, Path, str]],
+        timeline: List[SlideSpan],
         speaker_video: Path,
         output: str,
         pip_scale: float,
@@ -673,7 +857,7 @@ class VideoGenerator:
         Generate the final presentation video.
 
         Args:
-            timeline: List of (start_time, end_time, slide_path, slide_type) tuples
+            timeline: List of SlideSpan entries
             speaker_video: Path to the main speaker video
             output: Output filename
             pip_scale: Scale factor for picture-in-picture (0-1)
@@ -683,38 +867,192 @@ class VideoGenerator:
             max_duration: Maximum video duration in seconds (for debugging)
             keep_ffmpeg_logs: Keep FFmpeg log files after successful completion (always kept on error)
         """
+        # Scratch directory for the slide concat lists, removed once the video is generated
+        with tempfile.TemporaryDirectory(prefix="mlconf-dlp-") as work_dir:
+            self._generate(
+                timeline,
+                speaker_video,
+                output,
+                pip_scale,
+                pip_position,
+                preset,
+                crf,
+                max_duration,
+                keep_ffmpeg_logs,
+                Path(work_dir),
+            )
+
+    @staticmethod
+    def _read_pipes(process: subprocess.Popen):
+        """
+        Read a process's stdout and stderr pipes as output arrives, until all are closed.
+
+        Waits on the pipes with a selector instead of polling them, so there is
+        no sleep between reads and no wakeup while ffmpeg is silent.
+
+        Args:
+            process: Process started with stdout and/or stderr set to subprocess.PIPE
+
+        Yields:
+            (pipe, chunk) tuples, where pipe is process.stdout or process.stderr
+        """
+        pipes = [pipe for pipe in (process.stdout, process.stderr) if pipe is not None]
+
+        if os.name == "nt":
+            # Windows cannot select() on pipes: drain each one from its own thread
+            chunks = queue.Queue()
+
+            def drain(pipe):
+                for chunk in iter(lambda: pipe.read(_PIPE_READ_SIZE), b""):
+                    chunks.put((pipe, chunk))
+                chunks.put((pipe, None))  # EOF
+
+            for pipe in pipes:
+                threading.Thread(target=drain, args=(pipe,), daemon=True).start()
+
+            open_pipes = len(pipes)
+            while open_pipes:
+                pipe, chunk = chunks.get()
+                if chunk is None:
+                    open_pipes -= 1
+                else:
+                    yield pipe, chunk
+            return
+
+        with selectors.DefaultSelector() as selector:
+            for pipe in pipes:
+                selector.register(pipe, selectors.EVENT_READ)
+
+            while selector.get_map():
+                for key, _ in selector.select():
+                    # A single read() returns whatever the pipe holds, up to _PIPE_READ_SIZE
+                    chunk = os.read(key.fd, _PIPE_READ_SIZE)
+                    if chunk:
+                        yield key.fileobj, chunk
+                    else:
+                        selector.unregister(key.fileobj)  # EOF: ffmpeg closed this pipe
+
+    def _group_slides(
+        self, timeline: List[SlideSpan]
+    ) -> List[List[SlideSpan]]:
+        """
+        Group consecutive image slides of the same file type.
+
+        Each group of images is read through a single concat demuxer input, so ffmpeg
+        opens one input (and decoder) per group instead of one per slide.
+        Video slides are always in a group of their own.
+
+        Args:
+            timeline: List of SlideSpan entries
+
+        Returns:
+            List of groups, each a list of timeline entries
+        """
+        groups = []
+        for entry in timeline:
+            previous = groups[-1][-1] if groups else None
+            if (
+                entry.slide_type == "image"
+                and previous is not None
+                and previous.slide_type == "image"
+                and previous.slide_path.suffix.lower() == entry.slide_path.suffix.lower()
+            ):
+                groups[-1].append(entry)
+            else:
+                groups.append([entry])
+        return groups
+
+    def _write_concat_list(self, entries: List[SlideSpan], list_path: Path):
+        """
+        Write an ffmpeg concat demuxer list showing each image for its chapter duration.
+
+        Args:
+            entries: Timeline entries of image slides
+            list_path: Path of the list file to write
+        """
+        lines = []
+        for start_time, end_time, slide_path, _ in entries:
+            # Absolute paths (the list lives in a scratch directory), with quotes escaped
+            quoted_path = os.path.abspath(slide_path).replace("'", "'\\''")
+            lines.append(f"file '{quoted_path}'")
+            lines.append(f"duration {end_time - start_time:.6f}")
+        # The concat demuxer ignores the duration of the last entry unless its file is listed again
+        lines.append(f"file '{quoted_path}'")
+        list_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    def _generate(
+        self,
+        timeline: List[SlideSpan],
+        speaker_video: Path,
+        output: str,
+        pip_scale: float,
+        pip_position: str,
+        preset: str,
+        crf: int,
+        max_duration: Optional[int],
+        keep_ffmpeg_logs: bool,
+        work_dir: Path,
+    ):
+        """
+        Generate the final presentation video (see process()).
+
+        Args:
+            work_dir: Scratch directory for the slide concat lists
+        """
         self._log("Starting video generation")
         self._log(f"Output: {output}")
 
-        # Build slide streams
+        # Probe the first slide's dimensions (needed to size the PiP) and the speaker's audio
+        # codec in background threads, so the ffprobe start-ups overlap with building the
+        # slide streams below
+        probe_executor = concurrent.futures.ThreadPoolExecutor(max_workers=2)
+        first_slide_probe = probe_executor.submit(self._probe_dimensions, timeline[0].slide_path)
+        audio_codec_probe = probe_executor.submit(self._probe_audio_codec, speaker_video)
+        probe_executor.shutdown(wait=False)
+
+        # This loop only logs: skip it entirely unless verbose
+        if self.verbose:
+            for i, (start_time, end_time, slide_path, slide_type) in enumerate(timeline):
+                duration = end_time - start_time
+                self._log(
+                    f"Processing slide {i+1}/{len(timeline)}: {slide_path.name} ({slide_type}, {duration:.2f}s)"
+                )
+
+        # Build slide streams, one per group of consecutive slides
         slide_streams = []
 
-        for i, (start_time, end_time, slide_path, slide_type) in enumerate(timeline):
+        for group_idx, group in enumerate(self._group_slides(timeline)):
+            start_time, end_time, slide_path, slide_type = group[0]
             duration = end_time - start_time
-            self._log(
-                f"Processing slide {i+1}/{len(timeline)}: {slide_path.name} ({slide_type}, {duration:.2f}s)"
-            )
 
             if slide_type == "image":
-                # Create looped image for duration
+                # Read the whole group of images through one concat demuxer input.
+                # Each image is decoded and scaled once, then the fps filter repeats it
+                # at 25 fps for the duration of its chapter.
+                list_path = work_dir / f"slides-{group_idx:04d}.txt"
+                self._write_concat_list(group, list_path)
+                group_duration = sum(entry.end_time - entry.start_time for entry in group)
                 stream = (
-                    ffmpeg.input(str(slide_path), loop=1, t=duration, framerate=25)
+                    # reinit_filter=0: images may differ in pixel format (e.g., RGB vs RGBA),
+                    # which the scale filter converts instead of rebuilding the whole graph
+                    ffmpeg.input(str(list_path), f="concat", safe=0, reinit_filter=0)
                     .filter("scale", "trunc(iw/2)*2", "trunc(ih/2)*2")  # Ensure even dimensions
                     .filter("setsar", "1")  # Set sample aspect ratio to 1:1
+                    .filter("fps", 25)  # Repeat each image at 25 fps
+                    .filter("trim", duration=group_duration)  # Drop the repeated last entry
                 )
             else:  # video
-                # Use video slide, trim to duration if needed
+                # Use video slide, limited to duration on the input side (-t) so ffmpeg
+                # stops reading and decoding at the end of the chapter
                 stream = (
-                    ffmpeg.input(str(slide_path))
-                    .filter("trim", duration=duration)
-                    .filter("setpts", "PTS-STARTPTS")
+                    ffmpeg.input(str(slide_path), t=duration)
                     .filter("scale", "trunc(iw/2)*2", "trunc(ih/2)*2")  # Ensure even dimensions
                 )
 
             slide_streams.append(stream)
 
         # Concatenate all slides
-        self._log("Concatenating slides")
+        self._log(f"Concatenating slides ({len(slide_streams)} ffmpeg inputs)")
         slides = ffmpeg.concat(*slide_streams, v=1, a=0).node
 
         # Create PiP from speaker video
@@ -726,42 +1064,13 @@ class VideoGenerator:
         else:
             speaker = ffmpeg.input(str(speaker_video))
 
-        # Position mapping (no padding, directly in corners)
-        # W and H in overlay refer to the main video (slides) dimensions
-        # w and h refer to the overlay video (PiP) dimensions
-        positions = {
-            "top-right": {"x": "W-w", "y": "0"},
-            "top-left": {"x": "0", "y": "0"},
-            "bottom-right": {"x": "W-w", "y": "H-h"},
-            "bottom-left": {"x": "0", "y": "H-h"},
-        }
-
         # Scale PiP relative to the main video (slides) dimensions
         # Since scale2ref is deprecated and has issues, let's use a different approach
-        # We'll probe the first slide to get its dimensions, then scale accordingly
-
-        # Get dimensions of the first slide
-        import subprocess
-        import json as json_module
-
-        # Get the first slide path from timeline
-        first_slide_path = str(timeline[0][2])
-
-        # Probe the slide to get dimensions
-        probe_cmd = [
-            'ffprobe',
-            '-v', 'error',
-            '-select_streams', 'v:0',
-            '-show_entries', 'stream=width,height',
-            '-of', 'json',
-            first_slide_path
-        ]
+        # We use the dimensions of the first slide (probed above), then scale accordingly
 
         try:
-            probe_result = subprocess.run(probe_cmd, capture_output=True, text=True, check=True)
-            probe_data = json_module.loads(probe_result.stdout)
-            slide_width = probe_data['streams'][0]['width']
-            slide_height = probe_data['streams'][0]['height']
+            # Wait for the background probe of the first slide
+            slide_width, slide_height = first_slide_probe.result()
 
             # Calculate target PiP width
             target_pip_width = int(slide_width * pip_scale)
@@ -772,7 +1081,7 @@ class VideoGenerator:
             # Scale the PiP to the calculated width, maintaining aspect ratio
             pip = speaker.video.filter("scale", target_pip_width, -2)  # -2 maintains aspect ratio with even height
 
-        except (subprocess.CalledProcessError, json_module.JSONDecodeError, KeyError) as e:
+        except (subprocess.CalledProcessError, json.JSONDecodeError, KeyError) as e:
             self._log(f"Warning: Could not probe slide dimensions: {e}")
             self._log(f"Falling back to default scaling")
             # Fallback: assume 1920x1080 and scale accordingly
@@ -780,7 +1089,9 @@ class VideoGenerator:
             pip = speaker.video.filter("scale", target_pip_width, -2)
 
         # Overlay the scaled PiP on the slides
-        video = ffmpeg.overlay(slides[0], pip, **positions[pip_position])
+        # eval=init: the coordinates only depend on the (constant) frame sizes, so ffmpeg
+        # evaluates them once instead of re-evaluating the expressions for every frame
+        video = ffmpeg.overlay(slides[0], pip, eval="init", **self._POSITIONS[pip_position])
 
         # Use audio from speaker video
         audio = speaker.audio
@@ -797,7 +1108,7 @@ class VideoGenerator:
         video_encoder = self._detect_available_encoders()
 
         # Show encoder info to user (even in non-verbose mode)
-        if video_encoder in ['h264_videotoolbox', 'h264_nvenc']:
+        if video_encoder in ['h264_videotoolbox', 'h264_nvenc', 'h264_qsv']:
             click.echo(f"Using hardware-accelerated encoder: {video_encoder}")
 
         try:
@@ -808,6 +1119,19 @@ class VideoGenerator:
                 "strict": "experimental",
             }
 
+            # The speaker's audio goes through untouched, so copy it when it is already AAC
+            # (the usual case) instead of decoding and re-encoding it
+            try:
+                audio_codec = audio_codec_probe.result()
+            except (subprocess.CalledProcessError, json.JSONDecodeError) as e:
+                self._log(f"Warning: Could not probe speaker audio codec: {e}")
+                audio_codec = None
+            if audio_codec == "aac":
+                output_args["acodec"] = "copy"
+                self._log("Copying speaker audio (already AAC)")
+            else:
+                self._log(f"Encoding speaker audio to AAC (source: {audio_codec})")
+
             # Hardware encoders have different parameter names and requirements
             if video_encoder == 'h264_videotoolbox':
                 # VideoToolbox uses 'b:v' (bitrate) instead of 'crf'
@@ -822,17 +1146,26 @@ class VideoGenerator:
                 output_args['b:v'] = bitrate_map.get(crf, '2.5M')
                 self._log(f"Using VideoToolbox with bitrate: {output_args['b:v']}")
             elif video_encoder == 'h264_nvenc':
-                # NVENC supports CRF and preset
-                output_args['crf'] = crf
-                # NVENC preset mapping: ultrafast->fast, veryfast->medium, medium->slow, slow->slow
+                # NVENC has no CRF: use constant-quality VBR with the CRF value as target quality
+                output_args['rc'] = 'vbr'
+                output_args['cq'] = crf
+                output_args['b:v'] = 0  # No bitrate cap, quality-driven
+                output_args['tune'] = 'hq'
+                # NVENC preset mapping (p1=fastest .. p7=best quality)
                 nvenc_preset_map = {
-                    'ultrafast': 'fast',
-                    'veryfast': 'medium',
-                    'medium': 'slow',
-                    'slow': 'slow',
+                    'ultrafast': 'p2',
+                    'veryfast': 'p4',
+                    'medium': 'p5',
+                    'slow': 'p7',
                 }
-                output_args['preset'] = nvenc_preset_map.get(preset, 'medium')
-                self._log(f"Using NVENC with CRF {crf} and preset {output_args['preset']}")
+                output_args['preset'] = nvenc_preset_map.get(preset, 'p4')
+                self._log(f"Using NVENC with CQ {crf} and preset {output_args['preset']}")
+            elif video_encoder == 'h264_qsv':
+                # Quick Sync uses global_quality (ICQ) instead of 'crf'
+                output_args['global_quality'] = crf
+                # QSV has no 'ultrafast' preset; veryfast is its fastest
+                output_args['preset'] = 'veryfast' if preset == 'ultrafast' else preset
+                self._log(f"Using Quick Sync with global quality {crf} and preset {output_args['preset']}")
             else:  # libx264
                 # Standard x264 parameters
                 output_args['crf'] = crf
@@ -842,10 +1175,6 @@ class VideoGenerator:
             # Configure FFmpeg output based on verbose mode
             if self.verbose:
                 # Verbose mode: show all FFmpeg output in real-time and save to log files
-                import subprocess
-                import sys
-                import os
-
                 cmd = ffmpeg.output(video, audio, output, **output_args).overwrite_output().compile()
 
                 # Open log files
@@ -861,61 +1190,19 @@ class VideoGenerator:
                         bufsize=0,  # Unbuffered
                     )
 
-                    # Make pipes non-blocking on Unix systems for real-time output
-                    if os.name != "nt":
-                        import fcntl
-                        for pipe in [process.stdout, process.stderr]:
-                            flags = fcntl.fcntl(pipe, fcntl.F_GETFL)
-                            fcntl.fcntl(pipe, fcntl.F_SETFL, flags | os.O_NONBLOCK)
-
                     # Collect all output while displaying in real-time
-                    stdout_full = b""
-                    stderr_full = b""
-
-                    while True:
-                        # Check if process has ended
-                        if process.poll() is not None:
-                            # Read any remaining data
-                            try:
-                                remaining_stdout = process.stdout.read()
-                                if remaining_stdout:
-                                    stdout_full += remaining_stdout
-                                    sys.stdout.buffer.write(remaining_stdout)
-                                    sys.stdout.buffer.flush()
-                            except:
-                                pass
-                            try:
-                                remaining_stderr = process.stderr.read()
-                                if remaining_stderr:
-                                    stderr_full += remaining_stderr
-                                    sys.stderr.buffer.write(remaining_stderr)
-                                    sys.stderr.buffer.flush()
-                            except:
-                                pass
-                            break
-
-                        # Try to read from both stdout and stderr
-                        try:
-                            chunk = process.stdout.read(1024)
-                            if chunk:
-                                stdout_full += chunk
-                                sys.stdout.buffer.write(chunk)
-                                sys.stdout.buffer.flush()
-                        except (BlockingIOError, IOError):
-                            pass
-
-                        try:
-                            chunk = process.stderr.read(1024)
-                            if chunk:
-                                stderr_full += chunk
-                                sys.stderr.buffer.write(chunk)
-                                sys.stderr.buffer.flush()
-                        except (BlockingIOError, IOError):
-                            pass
-
-                        # Small sleep to avoid busy-waiting
-                        import time
-                        time.sleep(0.01)
+                    stdout_full = bytearray()  # Grows in place, unlike bytes
+                    stderr_full = bytearray()
+
+                    for pipe, chunk in self._read_pipes(process):
+                        if pipe is process.stdout:
+                            stdout_full += chunk
+                            sys.stdout.buffer.write(chunk)
+                            sys.stdout.buffer.flush()
+                        else:
+                            stderr_full += chunk
+                            sys.stderr.buffer.write(chunk)
+                            sys.stderr.buffer.flush()
 
                     # Write collected output to log files
                     stdout_file.write(stdout_full)
@@ -923,38 +1210,41 @@ class VideoGenerator:
 
                     process.wait()
                     if process.returncode != 0:
-                        raise ffmpeg.Error("ffmpeg", "", "")
+                        raise ffmpeg.Error("ffmpeg", bytes(stdout_full), bytes(stderr_full))
                 finally:
                     stdout_file.close()
                     stderr_file.close()
             else:
                 # Non-verbose mode: show progress bar with tqdm
-                import subprocess
-                import sys
-                import os
-                import re
-                from tqdm import tqdm
-
+                # -progress pipe:1 makes ffmpeg write machine-readable progress to stdout as
+                # key=value lines (one block per update), so there is no need to scrape the
+                # human-readable stats line from stderr; -nostats turns that line off
                 cmd = (
-                    ffmpeg.output(video, audio, output, **output_args).overwrite_output().compile()
+                    ffmpeg.output(video, audio, output, **output_args)
+                    .global_args("-nostats", "-progress", "pipe:1")
+                    .overwrite_output()
+                    .compile()
                 )
 
                 # Calculate total duration from timeline
-                total_duration = timeline[-1][1] if timeline else 0
+                total_duration = timeline[-1].end_time if timeline else 0
+
+                # Open log files (always written, removed after success unless kept)
+                stdout_file = open(stdout_log, 'wb')
+                stderr_file = open(stderr_log, 'wb')
+                stdout_full = bytearray()  # Collect all stdout (progress) for logging, in place
 
+                # Only the progress goes through a pipe. ffmpeg's diagnostics go straight to
+                # the stderr log file: nothing has to drain them, so however much ffmpeg
+                # writes, it can never block on a full pipe
                 process = subprocess.Popen(
                     cmd,
                     stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
+                    stderr=stderr_file,
                     universal_newlines=False,
                     bufsize=0,
                 )
 
-                # Open log files if temp_dir provided
-                stdout_file = open(stdout_log, 'wb') if stdout_log else None
-                stderr_file = open(stderr_log, 'wb') if stderr_log else None
-                stderr_full = b""  # Collect all stderr for logging
-
                 # Create progress bar
                 # Helper function to format seconds as MM:SS
                 def format_time(seconds):
@@ -962,103 +1252,80 @@ class VideoGenerator:
                     secs = int(seconds % 60)
                     return f"{mins:02d}:{secs:02d}"
 
+                total_str = format_time(total_duration)  # Loop-invariant
+
                 pbar = tqdm(
                     total=total_duration,
                     desc="Encoding",
                     bar_format="{desc}: {percentage:3.0f}%|{bar}| {postfix} [{elapsed}<{remaining}]",
                 )
 
-                # Read stderr in real-time and update progress bar
+                # Read progress from stdout in real-time and update progress bar
                 buffer = b""
-                last_time = 0
-
-                # Make stderr non-blocking on Unix systems
-                if os.name != "nt":
-                    import fcntl
-                    flags = fcntl.fcntl(process.stderr, fcntl.F_GETFL)
-                    fcntl.fcntl(process.stderr, fcntl.F_SETFL, flags | os.O_NONBLOCK)
-
-                while True:
-                    # Check if process has ended
-                    if process.poll() is not None:
-                        # Process finished - read any remaining data
-                        try:
-                            remaining = process.stderr.read()
-                            if remaining:
-                                buffer += remaining
-                        except:
-                            pass
-                        break
-
-                    # Try to read data (non-blocking on Unix)
-                    try:
-                        chunk = process.stderr.read(1024)
-                        if chunk:
-                            buffer += chunk
-                            stderr_full += chunk  # Collect for logging
-                    except (BlockingIOError, IOError):
-                        # No data available right now, sleep briefly to avoid busy-waiting
-                        import time
-                        time.sleep(0.01)
-
-                    # Process complete lines (ending with \r or \n)
-                    while b"\r" in buffer or b"\n" in buffer:
-                        if b"\r" in buffer:
-                            idx = buffer.index(b"\r")
-                        elif b"\n" in buffer:
-                            idx = buffer.index(b"\n")
-
-                        line = buffer[:idx].decode("utf-8", errors="ignore").strip()
-                        buffer = buffer[idx + 1 :]
-
-                        # Extract time and speed from FFmpeg progress line
-                        if "time=" in line:
-                            # Extract time (format: HH:MM:SS.ZZ)
-                            time_match = re.search(r"time=(\d+):(\d+):(\d+\.\d+)", line)
-                            if time_match:
-                                hours = int(time_match.group(1))
-                                minutes = int(time_match.group(2))
-                                seconds = float(time_match.group(3))
-                                current_time = hours * 3600 + minutes * 60 + seconds
-
-                                # Update progress bar
-                                pbar.n = min(current_time, total_duration)
-
-                                # Format current and total time as MM:SS
-                                current_str = format_time(current_time)
-                                total_str = format_time(total_duration)
-
-                                # Extract and display speed
-                                speed_match = re.search(r"speed=\s*(\S+)", line)
-                                speed_str = ""
-                                if speed_match:
-                                    speed = speed_match.group(1)
-                                    speed_str = f", speed={speed}"
-
-                                pbar.set_postfix_str(f"{current_str}/{total_str}{speed_str}")
-
-                                pbar.refresh()
-                                last_time = current_time
-
-                # Ensure progress bar reaches 100% before closing
-                pbar.n = total_duration
-                pbar.set_postfix_str(f"{format_time(total_duration)}/{format_time(total_duration)}, done")
-                pbar.refresh()
-                pbar.close()
+                progress = {}  # Latest key=value pairs of the current progress block
+
+                for _, chunk in self._read_pipes(process):
+                    stdout_full += chunk  # Collect for logging
+
+                    # Split into complete progress lines (key=value) in one pass;
+                    # the last piece is an incomplete line kept for the next chunk
+                    *lines, buffer = (buffer + chunk).split(b"\n")
+                    completed_block = None  # (out_time_us, speed) of the newest block closed here
+                    for line in lines:
+                        # Keys and values stay bytes: only the speed is ever decoded, for display
+                        key, _, value = line.partition(b"=")
+                        progress[key.strip()] = value.strip()
+
+                        # "progress=continue" (or "end") closes a block
+                        if key == b"progress":
+                            completed_block = (
+                                progress.get(b"out_time_us", b""),
+                                progress.get(b"speed", b""),
+                            )
+
+                    # Update the progress bar once per read, from the newest complete block:
+                    # when several blocks arrive together, only the last one would be visible
+                    if completed_block is not None:
+                        out_time_us, speed = completed_block
+
+                        # out_time_us is the encoded duration in microseconds ("N/A" at start)
+                        if out_time_us.isdigit():
+                            current_time = int(out_time_us) / 1_000_000
+
+                            # Update progress bar
+                            pbar.n = min(current_time, total_duration)
+
+                            # Format current time as MM:SS
+                            current_str = format_time(current_time)
+
+                            # Display speed
+                            speed = speed.decode("utf-8", errors="ignore")
+                            speed_str = f", speed={speed}" if speed and speed != "N/A" else ""
+
+                            # Render once, below (set_postfix_str would otherwise render too)
+                            pbar.set_postfix_str(f"{current_str}/{total_str}{speed_str}", refresh=False)
+
+                            pbar.refresh()
 
                 process.wait()
 
-                # Read stdout and write logs
-                stdout_data = process.stdout.read()
-                if stdout_file:
-                    stdout_file.write(stdout_data)
-                    stdout_file.close()
-                if stderr_file:
-                    stderr_file.write(stderr_full)
-                    stderr_file.close()
+                # Ensure progress bar reaches 100% before closing (unless ffmpeg failed)
+                if process.returncode == 0:
+                    pbar.n = total_duration
+                    pbar.set_postfix_str(f"{total_str}/{total_str}, done", refresh=False)
+                    pbar.refresh()
+                pbar.close()
+
+                # Write logs
+                stdout_file.write(stdout_full)
+                stdout_file.close()
+                stderr_file.close()
 
                 if process.returncode != 0:
-                    raise ffmpeg.Error("ffmpeg", "", "")
+                    # Attach ffmpeg's diagnostics (already on disk in the stderr log) to the error
+                    with open(stderr_log, 'rb') as f:
+                        stderr_data = f.read()
+                    raise ffmpeg.Error("ffmpeg", bytes(stdout_full), stderr_data)
 
             self._log(f"Video generation complete: {output}")
             click.echo(f"✓ Successfully created: {output}")
@@ -1077,8 +1344,10 @@ class VideoGenerator:
                     click.echo("FFmpeg logs cleaned up")
 
         except ffmpeg.Error as e:
-            if self.verbose and e.stderr:
-                click.echo(e.stderr.decode(), err=True)
+            # Verbose mode has already streamed ffmpeg's output; otherwise show how it ended
+            if not self.verbose and e.stderr:
+                tail = e.stderr.decode(errors="replace").strip().splitlines()[-10:]
+                click.echo("\n".join(tail), err=True)
             # On error, always keep logs for debugging
             click.echo(f"⚠ FFmpeg logs preserved for debugging: {stdout_log} and {stderr_log}")
             raise ValidationError(f"FFmpeg error during video generation: {e}")
@@ -1111,9 +1380,7 @@ class VideoGenerator:
 @click.option(
     "--pip-position",
     default="top-right",
-    type=click.Choice(
-        ["top-right", "top-left", "bottom-right", "bottom-left"], case_sensitive=False
-    ),
+    type=click.Choice(list(VideoGenerator._POSITIONS), case_sensitive=False),
     help="Picture-in-picture position (default: top-right)",
 )
 @click.option("--verbose", "-v", is_flag=True, help="Enable verbose output for debugging")
@@ -1143,7 +1410,7 @@ class VideoGenerator:
 @click.option(
     "--hw-accel",
     is_flag=True,
-    help="Enable hardware acceleration (h264_videotoolbox on macOS, h264_nvenc on NVIDIA GPUs). Default uses software encoding (libx264).",
+    help="Enable hardware acceleration (h264_videotoolbox on macOS, h264_nvenc on NVIDIA GPUs, h264_qsv on Intel GPUs). Default uses software encoding (libx264).",
 )
 def main(
     input: str,
@@ -1226,15 +1493,8 @@ def main(
         sys.exit(1)
 
     # Map preset to default CRF if not overridden
-    preset_crf_map = {
-        "ultrafast": 28,
-        "veryfast": 23,
-        "medium": 23,
-        "slow": 18,
-    }
-
     if crf is None:
-        crf = preset_crf_map[preset]
+        crf = _PRESET_CRF[preset]
         if verbose:
             click.echo(f"Using preset '{preset}' with default CRF {crf}")
     else:
@@ -1280,10 +1540,10 @@ def main(
     if max_duration is not None:
         original_length = len(timeline)
         # Keep only slides that start before max_duration
+        # (the timeline is sorted by start time, so stop at the first one past it)
         timeline = [
-            (start, min(end, max_duration), path, slide_type)
-            for start, end, path, slide_type in timeline
-            if start < max_duration
+            entry._replace(end_time=min(entry.end_time, max_duration))
+            for entry in itertools.takewhile(lambda entry: entry.start_time < max_duration, timeline)
         ]
         if verbose:
             click.echo(
@@ -1297,7 +1557,7 @@ def main(
 
     # Calculate statistics from timeline
     total_slides = len(timeline)
-    total_duration = timeline[-1][1] if timeline else 0  # End time of last slide
+    total_duration = timeline[-1].end_time if timeline else 0  # End time of last slide
 
     # Display summary (always shown, not just in verbose mode)
     click.echo("\n" + "=" * 60)
@@ -1354,8 +1614,6 @@ def main(
     except Exception as e:
         click.echo(f"Unexpected error: {e}", err=True)
         if verbose:
-            import traceback
-
             traceback.print_exc()
         # Clean up temp dir on error (only if we created it)
         if created_temp_dir and temp_dir and os.path.exists(temp_dir):